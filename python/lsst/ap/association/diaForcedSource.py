@@ -26,6 +26,7 @@ locations.
 __all__ = ["DiaForcedSourceTask", "DiaForcedSourcedConfig"]
 
 import numpy as np
+import pandas as pd
 
 import lsst.afw.table as afwTable
 from lsst.daf.base import DateTime
@@ -95,6 +96,15 @@ class DiaForcedSourcedConfig(pexConfig.Config):
         doc="Columns produced in forced measurement that can be dropped upon "
             "creation and storage of the final pandas data.",
     )
+    outputFloatDtype = pexConfig.ChoiceField(
+        dtype=str,
+        doc="Floating point type of the flux and centroid columns in the "
+            "output DataFrame.",
+        allowed={"float64": "Double precision, as measured.",
+                 "float32": "Single precision. Halves the memory and storage "
+                            "size of these columns."},
+        default="float64",
+    )
 
     def setDefaults(self):
         self.forcedMeasurement.plugins = ["ap_assoc_TransformedCentroid",
@@ -125,11 +135,30 @@ class DiaForcedSourceTask(pipeBase.Task):
     """
     ConfigClass = DiaForcedSourcedConfig
     _DefaultName = "diaForcedSource"
+    # Output columns cast to ``config.outputFloatDtype``.
+    _floatColumns = ("psFlux", "psFluxErr", "totFlux", "totFluxErr", "x", "y")
 
     def __init__(self, **kwargs):
         pipeBase.Task.__init__(self, **kwargs)
         self.makeSubtask("forcedMeasurement",
                          refSchema=afwTable.SourceTable.makeMinimalSchema())
+        self._measSchema = self.forcedMeasurement.schema
+        self._dropSet = frozenset(self.config.dropColumns)
+        # Columns of the measurement schema to copy to the output, including
+        # slot aliases, and their output names. The schema is fixed by the
+        # configuration, so the column plan is resolved once here. The
+        # instrumental fluxes are replaced by calibrated ones and are not
+        # copied.
+        renameColumns = {"id": "diaForcedSourceId",
+                         "slot_Centroid_x": "x",
+                         "slot_Centroid_y": "y"}
+        calibratedColumns = {"slot_PsfFlux_instFlux",
+                             "slot_PsfFlux_instFluxErr"}
+        self._outputColumns = [
+            (renameColumns.get(name, name), item.key)
+            for name, item in self._measSchema.extract(
+                "*", ordered=True).items()
+            if name not in self._dropSet and name not in calibratedColumns]
 
     @pipeBase.timeMethod
     def run(self,
@@ -166,22 +195,15 @@ class DiaForcedSourceTask(pipeBase.Task):
 
         afw_dia_objects = self._convert_from_pandas(dia_objects)
 
-        idFactoryDiff = afwTable.IdFactory.makeSource(
+        diffForcedSources = self._make_meas_cat(afw_dia_objects)
+        diffForcedSources["id"] = self._make_forced_source_ids(
+            len(diffForcedSources),
             diffim.getInfo().getVisitInfo().getExposureId(),
-            afwTable.IdFactory.computeReservedFromMaxBits(int(expIdBits)))
+            expIdBits)
+        directForcedSources = self._make_meas_cat(afw_dia_objects)
 
-        diffForcedSources = self.forcedMeasurement.generateMeasCat(
-            diffim,
-            afw_dia_objects,
-            diffim.getWcs(),
-            idFactory=idFactoryDiff)
         self.forcedMeasurement.run(
             diffForcedSources, diffim, afw_dia_objects, diffim.getWcs())
-
-        directForcedSources = self.forcedMeasurement.generateMeasCat(
-            exposure,
-            afw_dia_objects,
-            exposure.getWcs())
         self.forcedMeasurement.run(
             directForcedSources, exposure, afw_dia_objects, exposure.getWcs())
 
@@ -193,9 +215,14 @@ class DiaForcedSourceTask(pipeBase.Task):
         output_forced_sources = self._trim_to_exposure(output_forced_sources,
                                                        updatedDiaObjectIds,
                                                        exposure)
-        return output_forced_sources.set_index(
-            ["diaObjectId", "diaForcedSourceId"],
-            drop=False)
+        # Build the index directly from the id arrays rather than through
+        # set_index, which copies the full DataFrame. The id columns are kept
+        # as they are required downstream.
+        output_forced_sources.index = pd.MultiIndex.from_arrays(
+            [output_forced_sources["diaObjectId"].to_numpy(),
+             output_forced_sources["diaForcedSourceId"].to_numpy()],
+            names=["diaObjectId", "diaForcedSourceId"])
+        return output_forced_sources
 
     def _convert_from_pandas(self, input_objects):
         """Create minimal schema SourceCatalog from a pandas DataFrame.
@@ -216,17 +243,84 @@ class DiaForcedSourceTask(pipeBase.Task):
         schema = afwTable.SourceTable.makeMinimalSchema()
 
         outputCatalog = afwTable.SourceCatalog(schema)
-        outputCatalog.reserve(len(input_objects))
-
-        for obj_id, df_row in input_objects.iterrows():
-            outputRecord = outputCatalog.addNew()
-            outputRecord.setId(obj_id)
-            outputRecord.setCoord(
-                geom.SpherePoint(df_row["ra"],
-                                 df_row["decl"],
-                                 geom.degrees))
+        outputCatalog.resize(len(input_objects))
+
+        # Fill the columns in bulk rather than record by record. afw stores
+        # coordinates as radians.
+        outputCatalog["id"] = input_objects.index.to_numpy(dtype=np.int64)
+        outputCatalog["coord_ra"] = np.deg2rad(
+            input_objects["ra"].to_numpy(dtype=np.float64))
+        outputCatalog["coord_dec"] = np.deg2rad(
+            input_objects["decl"].to_numpy(dtype=np.float64))
         return outputCatalog
 
+    def _make_forced_source_ids(self, nSources, exposureId, expIdBits):
+        """Compute unique DiaForcedSource ids for one exposure.
+
+        Produces the same ids as successive calls to an
+        ``lsst.afw.table.IdFactory.makeSource(exposureId, reserved)``
+        factory, i.e. the exposure id shifted into the upper bits and a
+        counter starting at one in the reserved lower bits.
+
+        Parameters
+        ----------
+        nSources : `int`
+            Number of ids to create.
+        exposureId : `int`
+            Id of the exposure the sources were measured on.
+        expIdBits : `int`
+            Bit length of the exposure id.
+
+        Returns
+        -------
+        ids : `numpy.ndarray`
+            Array of ``nSources`` unique ids.
+
+        Raises
+        ------
+        ValueError
+            Raised if ``nSources`` does not fit in the bits not used by the
+            exposure id.
+        """
+        reserved = afwTable.IdFactory.computeReservedFromMaxBits(
+            int(expIdBits))
+        if nSources >= 1 << reserved:
+            raise ValueError(
+                f"Cannot create {nSources} DiaForcedSource ids with only "
+                f"{reserved} bits reserved for the source counter.")
+        return ((int(exposureId) << reserved)
+                + np.arange(1, nSources + 1, dtype=np.int64))
+
+    def _make_meas_cat(self, refCat):
+        """Create an output catalog for forced measurement from the
+        DiaObject reference catalog.
+
+        Equivalent to ``ForcedMeasurementTask.generateMeasCat`` but copies the
+        reference columns in bulk instead of assigning each record through
+        the schema mapper.
+
+        Parameters
+        ----------
+        refCat : `lsst.afw.table.SourceCatalog`
+            Minimal schema catalog of DiaObjects to measure.
+
+        Returns
+        -------
+        measCat : `lsst.afw.table.SourceCatalog`
+            Catalog with the forced measurement schema and the reference
+            columns copied.
+        """
+        table = afwTable.SourceTable.make(self._measSchema,
+                                          afwTable.IdFactory.makeSimple())
+        table.setMetadata(self.forcedMeasurement.algMetadata)
+        measCat = afwTable.SourceCatalog(table)
+        measCat.resize(len(refCat))
+
+        copyColumns = self.forcedMeasurement.config.copyColumns
+        for inName, outName in copyColumns.items():
+            measCat[outName] = refCat[inName]
+        return measCat
+
     def _calibrate_and_merge(self,
                              diff_sources,
                              direct_sources,
@@ -254,35 +348,71 @@ class DiaForcedSourceTask(pipeBase.Task):
         diff_calib = diff_exp.getPhotoCalib()
         direct_calib = direct_exp.getPhotoCalib()
 
-        diff_fluxes = diff_calib.instFluxToNanojansky(diff_sources,
-                                                      "slot_PsfFlux")
-        direct_fluxes = direct_calib.instFluxToNanojansky(direct_sources,
-                                                          "slot_PsfFlux")
-
-        output_catalog = diff_sources.asAstropy().to_pandas()
-        output_catalog.rename(columns={"id": "diaForcedSourceId",
-                                       "slot_PsfFlux_instFlux": "psFlux",
-                                       "slot_PsfFlux_instFluxErr": "psFluxErr",
-                                       "slot_Centroid_x": "x",
-                                       "slot_Centroid_y": "y"},
-                              inplace=True)
-        output_catalog.loc[:, "psFlux"] = diff_fluxes[:, 0]
-        output_catalog.loc[:, "psFluxErr"] = diff_fluxes[:, 1]
-
-        output_catalog["totFlux"] = direct_fluxes[:, 0]
-        output_catalog["totFluxErr"] = direct_fluxes[:, 1]
+        diff_fluxes = self._calibrate_fluxes(diff_calib, diff_sources)
+        direct_fluxes = self._calibrate_fluxes(direct_calib, direct_sources)
 
         visit_info = direct_exp.getInfo().getVisitInfo()
         ccdVisitId = visit_info.getExposureId()
         midPointTaiMJD = visit_info.getDate().get(system=DateTime.MJD)
-        output_catalog["ccdVisitId"] = ccdVisitId
-        output_catalog["midPointTai"] = midPointTaiMJD
-        output_catalog["filterName"] = diff_exp.getFilterLabel().bandLabel
+        band = diff_exp.getFilterLabel().bandLabel
+
+        # Gather every output column first and build the DataFrame once.
+        # Dropped columns are never materialized.
+        data = {name: diff_sources[key] for name, key in self._outputColumns}
+        data["psFlux"] = diff_fluxes[:, 0]
+        data["psFluxErr"] = diff_fluxes[:, 1]
+        data["totFlux"] = direct_fluxes[:, 0]
+        data["totFluxErr"] = direct_fluxes[:, 1]
+
+        floatDtype = np.dtype(self.config.outputFloatDtype)
+        for column in self._floatColumns:
+            data[column] = data[column].astype(floatDtype, copy=False)
+
+        # Broadcast the per-exposure values with explicit dtypes. The band
+        # stays a plain string column as expected by the Apdb and alerts.
+        n_sources = len(diff_sources)
+        data["ccdVisitId"] = np.full(n_sources, ccdVisitId, dtype=np.int64)
+        data["midPointTai"] = np.full(n_sources, midPointTaiMJD,
+                                      dtype=np.float64)
+        data["filterName"] = np.full(n_sources, band, dtype=object)
+
+        return pd.DataFrame(data, copy=False)
+
+    def _calibrate_fluxes(self, calib, sources):
+        """Convert the slot PsfFlux of a catalog to nanojansky.
 
-        # Drop superfluous columns from output DataFrame.
-        output_catalog.drop(columns=self.config.dropColumns, inplace=True)
+        Array equivalent of ``calib.instFluxToNanojansky(sources,
+        "slot_PsfFlux")``; the calibration is evaluated at all of the slot
+        centroids in one call instead of record by record.
 
-        return output_catalog
+        Parameters
+        ----------
+        calib : `lsst.afw.image.PhotoCalib`
+            Photometric calibration of the exposure ``sources`` were
+            measured on.
+        sources : `lsst.afw.table.SourceCatalog`
+            Catalog with measured slot_PsfFlux and slot_Centroid.
+
+        Returns
+        -------
+        fluxes : `numpy.ndarray`, (N, 2)
+            Calibrated fluxes and their errors in nJy.
+        """
+        instFlux = sources["slot_PsfFlux_instFlux"]
+        instFluxErr = sources["slot_PsfFlux_instFluxErr"]
+        calibration = calib.getCalibrationMean() \
+            * calib.computeScaledCalibration().evaluate(
+                sources["slot_Centroid_x"], sources["slot_Centroid_y"])
+
+        fluxes = np.empty((len(sources), 2), dtype=np.float64)
+        fluxes[:, 0] = instFlux * calibration
+        # Propagate the errors the same way as afw, which gives a NaN error
+        # for zero instFlux.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fluxes[:, 1] = np.abs(fluxes[:, 0]) * np.hypot(
+                instFluxErr / instFlux,
+                calib.getCalibrationErr() / calibration)
+        return fluxes
 
     def _trim_to_exposure(self, catalog, updatedDiaObjectIds, exposure):
         """Remove DiaForcedSources that are outside of the bounding box region.
@@ -294,7 +424,9 @@ class DiaForcedSourceTask(pipeBase.Task):
         updatedDiaObjectIds : `numpy.ndarray`
             Array of diaObjectIds that were updated during this dia processing.
             Used to assure that the pipeline includes all diaObjects that were
-            updated in case one falls on the edge of the CCD.
+            updated in case one falls on the edge of the CCD. Ids that are
+            already sorted in ascending order are used without sorting a
+            copy.
         exposure : `lsst.afw.image.Exposure`
             Exposure to check against.
 
@@ -304,12 +436,36 @@ class DiaForcedSourceTask(pipeBase.Task):
             DataFrame trimmed to only the objects within the exposure bounding
             box.
         """
-        bbox = geom.Box2D(exposure.getBBox())
+        ids = catalog["diaObjectId"].to_numpy()
+
+        # Membership test against the sorted updated ids. Cast to the
+        # catalog id type so that searchsorted does not fall back to float
+        # comparisons when mixing signed and unsigned integers.
+        updatedIds = np.asarray(updatedDiaObjectIds).astype(ids.dtype,
+                                                            copy=False)
+        if np.any(updatedIds[1:] < updatedIds[:-1]):
+            updatedIds = np.sort(updatedIds)
+        if len(updatedIds) > 0:
+            updated = updatedIds.take(np.searchsorted(updatedIds, ids),
+                                      mode="clip") == ids
+        else:
+            updated = np.zeros(len(ids), dtype=bool)
+        if updated.all():
+            # Every DiaForcedSource is kept; skip the bounding box test.
+            return catalog
 
-        xS = catalog.loc[:, "x"]
-        yS = catalog.loc[:, "y"]
-
-        return catalog[
-            np.logical_or(bbox.contains(xS, yS),
-                          np.isin(catalog.loc[:, "diaObjectId"],
-                                  updatedDiaObjectIds))]
+        bbox = geom.Box2D(exposure.getBBox())
+        x = catalog["x"].to_numpy()
+        y = catalog["y"].to_numpy()
+        # Accumulate the bounds and membership tests into one mask, reusing a
+        # single scratch buffer rather than allocating a temporary per test.
+        # Matches ``Box2D.contains``: the minimum edges are inside the box and
+        # the maximum edges are not.
+        keep = np.greater_equal(x, bbox.getMinX())
+        scratch = np.empty_like(keep)
+        keep &= np.less(x, bbox.getMaxX(), out=scratch)
+        keep &= np.greater_equal(y, bbox.getMinY(), out=scratch)
+        keep &= np.less(y, bbox.getMaxY(), out=scratch)
+        keep |= updated
+
+        return catalog[keep]
@@ -59,10 +59,10 @@ def create_test_points(point_locs_deg,
         Schema of the objects to create. Defaults to the DIASource schema.
     scatter_arcsec : `float`
         Scatter to add to the position of each DIASource.
-    indexer_ids : `list` of `ints`s
+    indexer_ids : array-like of `int`s
         Id numbers of pixelization indexer to store. Must be the same length
         as the first dimension of point_locs_deg.
-    associated_ids : `list` of `ints`s
+    associated_ids : array-like of `int`s
         Id numbers of associated DIAObjects to store. Must be the same length
         as the first dimension of point_locs_deg.
     Returns
@@ -73,25 +73,41 @@ def create_test_points(point_locs_deg,
     if schema is None:
         schema = make_dia_source_schema()
     sources = afwTable.SourceCatalog(schema)
-
-    for src_idx, (ra, dec,) in enumerate(point_locs_deg):
-        src = sources.addNew()
-        src['id'] = src_idx + start_id
-        coord = geom.SpherePoint(ra, dec, geom.degrees)
-        if scatter_arcsec > 0.0:
-            coord = coord.offset(
-                np.random.rand() * 360 * geom.degrees,
-                np.random.rand() * scatter_arcsec * geom.arcseconds)
-        if indexer_ids is not None:
-            src['pixelId'] = indexer_ids[src_idx]
-        if associated_ids is not None:
-            src['diaObjectId'] = associated_ids[src_idx]
-        src.setCoord(coord)
-
-        if wcs is not None:
-            xyCentroid = wcs.skykToPixel(coord)
-            src.set("x", xyCentroid.getX())
-            src.set("y", xyCentroid.getY())
+    n_points = len(point_locs_deg)
+    sources.resize(n_points)
+
+    point_locs_rad = np.radians(
+        np.asarray(point_locs_deg, dtype=np.float64).reshape(n_points, 2))
+    ras = point_locs_rad[:, 0]
+    decs = point_locs_rad[:, 1]
+    if scatter_arcsec > 0.0:
+        # Move each point along a great circle by a random amount in a random
+        # direction, as SpherePoint.offset does, with the bearing measured
+        # from east towards north.
+        bearings = np.random.rand(n_points) * 2 * np.pi
+        amounts = np.radians(np.random.rand(n_points) * scatter_arcsec / 3600)
+        offset_decs = np.arcsin(
+            np.sin(decs) * np.cos(amounts)
+            + np.cos(decs) * np.sin(amounts) * np.sin(bearings))
+        ras = ras + np.arctan2(
+            np.cos(bearings) * np.sin(amounts) * np.cos(decs),
+            np.cos(amounts) - np.sin(decs) * np.sin(offset_decs))
+        decs = offset_decs
+    # Wrap RA into [0, 2pi) as SpherePoint does.
+    ras = np.mod(ras, 2 * np.pi)
+
+    sources['id'] = start_id + np.arange(n_points, dtype=np.int64)
+    sources['coord_ra'] = ras
+    sources['coord_dec'] = decs
+    if indexer_ids is not None:
+        sources['pixelId'] = np.asarray(indexer_ids, dtype=np.int64)
+    if associated_ids is not None:
+        sources['diaObjectId'] = np.asarray(associated_ids, dtype=np.int64)
+
+    if wcs is not None:
+        xs, ys = wcs.skyToPixelArray(ras, decs)
+        sources['x'] = xs
+        sources['y'] = ys
 
     return sources
 
@@ -117,10 +133,10 @@ def create_test_points_pandas(point_locs_deg,
         Schema of the objects to create. Defaults to the DIASource schema.
     scatter_arcsec : `float`
         Scatter to add to the position of each DIASource.
-    indexer_ids : `list` of `ints`s
+    indexer_ids : array-like of `int`s
         Id numbers of pixelization indexer to store. Must be the same length
         as the first dimension of point_locs_deg.
-    associated_ids : `list` of `ints`s
+    associated_ids : array-like of `int`s
         Id numbers of associated DIAObjects to store. Must be the same length
         as the first dimension of point_locs_deg.
     Returns
@@ -128,102 +144,112 @@ def create_test_points_pandas(point_locs_deg,
     test_points : `pandas.DataFrame`
         Catalog of points to test.
     """
-    if schema is None:
-        schema = make_dia_source_schema()
-    sources = afwTable.SourceCatalog(schema)
+    sources = create_test_points(point_locs_deg,
+                                 wcs=wcs,
+                                 start_id=start_id,
+                                 schema=schema,
+                                 scatter_arcsec=scatter_arcsec,
+                                 indexer_ids=indexer_ids,
+                                 associated_ids=associated_ids)
 
-    for src_idx, (ra, dec,) in enumerate(point_locs_deg):
-        src = sources.addNew()
-        src['id'] = src_idx + start_id
-        coord = geom.SpherePoint(ra, dec, geom.degrees)
-        if scatter_arcsec > 0.0:
-            coord = coord.offset(
-                np.random.rand() * 360 * geom.degrees,
-                np.random.rand() * scatter_arcsec * geom.arcseconds)
-        if indexer_ids is not None:
-            src['pixelId'] = indexer_ids[src_idx]
-        if associated_ids is not None:
-            src['diaObjectId'] = associated_ids[src_idx]
-        src.setCoord(coord)
-
-        if wcs is not None:
-            xyCentroid = wcs.skykToPixel(coord)
-            src.set("x", xyCentroid.getX())
-            src.set("y", xyCentroid.getY())
-
-    sources = sources.asAstropy().to_pandas()
+    return sources.asAstropy().to_pandas()
 
-    return sources
+
+def _diagonal_points(n_points, start=0):
+    """Create test point locations along a diagonal in RA, DEC.
+
+    Parameters
+    ----------
+    n_points : `int`
+        Number of points to create.
+    start : `int`
+        Position along the diagonal of the first point.
+
+    Returns
+    -------
+    point_locs_deg : `numpy.ndarray`, (N, 2)
+        Positions of the points in RA, DEC, spaced by 0.04 degrees in both.
+    """
+    idx = np.arange(start, start + n_points)
+    return 0.04 * np.column_stack([idx, idx])
 
 
 class TestAssociationTask(unittest.TestCase):
 
-    def setUp(self):
-        """Create a sqlite3 database with default tables and schemas.
+    @classmethod
+    def setUpClass(cls):
+        """Create the WCS and exposure shared by all tests.
         """
-        self.filter_names = ["u", "g", "r", "i", "z"]
-        self.dia_object_schema = make_dia_object_schema()
-
         # metadata taken from CFHT data
         # v695856-e0/v695856-e0-c000-a00.sci_img.fits
 
-        self.metadata = dafBase.PropertySet()
-
-        self.metadata.set("SIMPLE", "T")
-        self.metadata.set("BITPIX", -32)
-        self.metadata.set("NAXIS", 2)
-        self.metadata.set("NAXIS1", 1024)
-        self.metadata.set("NAXIS2", 1153)
-        self.metadata.set("RADECSYS", 'FK5')
-        self.metadata.set("EQUINOX", 2000.)
-
-        self.metadata.setDouble("CRVAL1", 215.604025685476)
-        self.metadata.setDouble("CRVAL2", 53.1595451514076)
-        self.metadata.setDouble("CRPIX1", 1109.99981456774)
-        self.metadata.setDouble("CRPIX2", 560.018167811613)
-        self.metadata.set("CTYPE1", 'RA---SIN')
-        self.metadata.set("CTYPE2", 'DEC--SIN')
-
-        self.metadata.setDouble("CD1_1", 5.10808596133527E-05)
-        self.metadata.setDouble("CD1_2", 1.85579539217196E-07)
-        self.metadata.setDouble("CD2_2", -5.10281493481982E-05)
-        self.metadata.setDouble("CD2_1", -8.27440751733828E-07)
-
-        self.wcs = afwGeom.makeSkyWcs(self.metadata)
-        self.exposure = afwImage.makeExposure(
+        cls.metadata = dafBase.PropertySet()
+
+        cls.metadata.set("SIMPLE", "T")
+        cls.metadata.set("BITPIX", -32)
+        cls.metadata.set("NAXIS", 2)
+        cls.metadata.set("NAXIS1", 1024)
+        cls.metadata.set("NAXIS2", 1153)
+        cls.metadata.set("RADECSYS", 'FK5')
+        cls.metadata.set("EQUINOX", 2000.)
+
+        cls.metadata.setDouble("CRVAL1", 215.604025685476)
+        cls.metadata.setDouble("CRVAL2", 53.1595451514076)
+        cls.metadata.setDouble("CRPIX1", 1109.99981456774)
+        cls.metadata.setDouble("CRPIX2", 560.018167811613)
+        cls.metadata.set("CTYPE1", 'RA---SIN')
+        cls.metadata.set("CTYPE2", 'DEC--SIN')
+
+        cls.metadata.setDouble("CD1_1", 5.10808596133527E-05)
+        cls.metadata.setDouble("CD1_2", 1.85579539217196E-07)
+        cls.metadata.setDouble("CD2_2", -5.10281493481982E-05)
+        cls.metadata.setDouble("CD2_1", -8.27440751733828E-07)
+
+        cls.wcs = afwGeom.makeSkyWcs(cls.metadata)
+        # Spacing in pixels of the diagonal grid test points are placed on.
+        cls.grid_step = 111.
+
+        # The tests only read the exposure's metadata, so a single exposure
+        # is shared rather than allocating its pixels for every test.
+        cls.exposure = afwImage.makeExposure(
             afwImage.makeMaskedImageFromArrays(np.ones((1024, 1153))),
-            self.wcs)
-        detector = DetectorWrapper(id=23, bbox=self.exposure.getBBox()).detector
+            cls.wcs)
+        detector = DetectorWrapper(id=23, bbox=cls.exposure.getBBox()).detector
         visit = afwImage.VisitInfo(
             exposureId=1234,
             exposureTime=200.,
             date=dafBase.DateTime("2014-05-13T17:00:00.000000000",
                                   dafBase.DateTime.Timescale.TAI))
-        self.exposure.setDetector(detector)
-        self.exposure.getInfo().setVisitInfo(visit)
-        self.exposure.setFilterLabel(afwImage.FilterLabel(band='g'))
-        self.flux0 = 10000
-        self.flux0_err = 100
-        self.exposure.setPhotoCalib(
-            afwImage.PhotoCalib(self.flux0, self.flux0_err))
-
-        bbox = geom.Box2D(self.exposure.getBBox())
-        wcs = self.exposure.getWcs()
-
-        self.pixelator = sphgeom.HtmPixelization(20)
+        cls.exposure.setDetector(detector)
+        cls.exposure.getInfo().setVisitInfo(visit)
+        cls.exposure.setFilterLabel(afwImage.FilterLabel(band='g'))
+        cls.flux0 = 10000
+        cls.flux0_err = 100
+        cls.exposure.setPhotoCalib(
+            afwImage.PhotoCalib(cls.flux0, cls.flux0_err))
+
+        bbox = geom.Box2D(cls.exposure.getBBox())
+        wcs = cls.exposure.getWcs()
+
+        cls.pixelator = sphgeom.HtmPixelization(20)
         region = sphgeom.ConvexPolygon([wcs.pixelToSky(pp).getVector()
                                         for pp in bbox.getCorners()])
 
-        indices = self.pixelator.envelope(region, 64)
+        indices = cls.pixelator.envelope(region, 64)
         # Index types must be cast to int to work with dax_apdb.
-        self.index_ranges = indices.ranges()
+        cls.index_ranges = indices.ranges()
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.metadata
+        del cls.wcs
+        del cls.exposure
 
-    def tearDown(self):
-        """Delete the database after we are done with it.
+    def setUp(self):
+        """Set the filter names and DiaObject schema used by each test.
         """
-        del self.metadata
-        del self.wcs
-        del self.exposure
+        self.filter_names = ["u", "g", "r", "i", "z"]
+        self.dia_object_schema = make_dia_object_schema()
 
     def test_run(self):
         """Test the run method with a database that already exists and
@@ -238,26 +264,34 @@ class TestAssociationTask(unittest.TestCase):
 
         # Test to make sure the number of DIAObjects have been properly
         # associated within the db.
-        for obj_idx, (df_idx, dia_object) in enumerate(dia_objects.iterrows()):
-            if df_idx == not_updated_idx:
-                # Test the DIAObject we expect to not be associated with any
-                # new DIASources.
-                self.assertEqual(dia_object['gPSFluxNdata'], 1)
-                self.assertEqual(dia_object['rPSFluxNdata'], 1)
-                self.assertEqual(dia_object['nDiaSources'], 2)
-                self.assertEqual(df_idx, obj_idx)
-            elif updated_idx_start <= df_idx < new_idx_start:
-                # Test that associating to the existing DIAObjects went
-                # as planned and test that the IDs of the newly associated
-                # DIASources is correct.
-                self.assertEqual(dia_object['gPSFluxNdata'], 2)
-                self.assertEqual(dia_object['rPSFluxNdata'], 1)
-                self.assertEqual(dia_object['nDiaSources'], 3)
-                self.assertEqual(df_idx, obj_idx)
-            else:
-                self.assertEqual(dia_object['gPSFluxNdata'], 1)
-                self.assertEqual(dia_object['nDiaSources'], 1)
-                self.assertEqual(df_idx, obj_idx + 4 + 5)
+        df_idx = dia_objects.index.to_numpy()
+        obj_idx = np.arange(len(dia_objects))
+        not_updated = df_idx == not_updated_idx
+        updated = (updated_idx_start <= df_idx) & (df_idx < new_idx_start)
+        new = ~(not_updated | updated)
+
+        # Test the DIAObject we expect to not be associated with any new
+        # DIASources.
+        np.testing.assert_array_equal(
+            dia_objects['gPSFluxNdata'][not_updated], 1)
+        np.testing.assert_array_equal(
+            dia_objects['rPSFluxNdata'][not_updated], 1)
+        np.testing.assert_array_equal(
+            dia_objects['nDiaSources'][not_updated], 2)
+        # Test that associating to the existing DIAObjects went as planned
+        # and test that the IDs of the newly associated DIASources is
+        # correct.
+        np.testing.assert_array_equal(
+            dia_objects['gPSFluxNdata'][updated], 2)
+        np.testing.assert_array_equal(
+            dia_objects['rPSFluxNdata'][updated], 1)
+        np.testing.assert_array_equal(
+            dia_objects['nDiaSources'][updated], 3)
+        np.testing.assert_array_equal(df_idx[~new], obj_idx[~new])
+        # Test the newly created DIAObjects.
+        np.testing.assert_array_equal(dia_objects['gPSFluxNdata'][new], 1)
+        np.testing.assert_array_equal(dia_objects['nDiaSources'][new], 1)
+        np.testing.assert_array_equal(df_idx[new], obj_idx[new] + 4 + 5)
 
     def test_run_no_existing_objects(self):
         """Test the run method with a completely empty database.
@@ -266,27 +300,22 @@ class TestAssociationTask(unittest.TestCase):
         total_expected_dia_objects = 9
         self.assertEqual(len(dia_objects),
                          total_expected_dia_objects)
-        for obj_idx, (df_idx, output_dia_object) in enumerate(dia_objects.iterrows()):
-            self.assertEqual(output_dia_object['gPSFluxNdata'], 1)
-            self.assertEqual(df_idx, obj_idx + 10)
+        np.testing.assert_array_equal(dia_objects['gPSFluxNdata'], 1)
+        np.testing.assert_array_equal(dia_objects.index.to_numpy(),
+                                      np.arange(len(dia_objects)) + 10)
 
-    def test_run_dup_diaSources(self):
-        """Test that duplicate sources being run through association throw the
-        correct error.
+    def test_run_dup(self):
+        """Test that duplicate sources or objects being run through
+        association throw the correct error.
         """
-        with self.assertRaises(RuntimeError):
-            self._run_association_and_retrieve_objects(create_objects=True,
-                                                       dupDiaSources=True,
-                                                       dupDiaObjects=False)
-
-    def test_run_dup_diaObjects(self):
-        """Test that duplicate objects being run through association throw the
-        correct error.
-        """
-        with self.assertRaises(RuntimeError):
-            self._run_association_and_retrieve_objects(create_objects=True,
-                                                       dupDiaSources=False,
-                                                       dupDiaObjects=True)
+        for dupDiaSources, dupDiaObjects in [(True, False), (False, True)]:
+            with self.subTest(dupDiaSources=dupDiaSources,
+                              dupDiaObjects=dupDiaObjects):
+                with self.assertRaises(RuntimeError):
+                    self._run_association_and_retrieve_objects(
+                        create_objects=True,
+                        dupDiaSources=dupDiaSources,
+                        dupDiaObjects=dupDiaObjects)
 
     def _run_association_and_retrieve_objects(self,
                                               create_objects=False,
@@ -328,22 +357,22 @@ class TestAssociationTask(unittest.TestCase):
                                    inplace=True,
                                    drop=False)
 
-        source_centers = [
-            [self.wcs.pixelToSky(idx, idx).getRa().asDegrees(),
-             self.wcs.pixelToSky(idx, idx).getDec().asDegrees()]
-            for idx in np.linspace(1, 1000, 10)[1:]]
+        # Sources sit on the diagonal pixel grid used for the seed
+        # DIAObjects, skipping the first grid point.
+        source_pixels = 1 + self.grid_step * np.arange(1, 10)
+        source_centers = np.column_stack(self.wcs.pixelToSkyArray(
+            source_pixels, source_pixels, degrees=True))
         dia_sources = create_test_points(
             point_locs_deg=source_centers,
             start_id=10,
             scatter_arcsec=-1)
-        for dia_source in dia_sources:
-            self._set_source_values(
-                dia_source=dia_source,
-                flux=10000,
-                fluxErr=100,
-                filterName=self.exposure.getFilterLabel().bandLabel,
-                ccdVisitId=self.exposure.getInfo().getVisitInfo().getExposureId(),
-                midPointTai=self.exposure.getInfo().getVisitInfo().getDate().get(system=dafBase.DateTime.MJD))
+        self._set_source_values(
+            dia_sources=dia_sources,
+            flux=10000,
+            fluxErr=100,
+            filterName=self.exposure.getFilterLabel().bandLabel,
+            ccdVisitId=self.exposure.getInfo().getVisitInfo().getExposureId(),
+            midPointTai=self.exposure.getInfo().getVisitInfo().getDate().get(system=dafBase.DateTime.MJD))
 
         assoc_task = AssociationTask()
 
@@ -376,14 +405,14 @@ class TestAssociationTask(unittest.TestCase):
                                  diaSourceHistory)
         return results.diaObjects
 
-    def _set_source_values(self, dia_source, flux, fluxErr, filterName,
+    def _set_source_values(self, dia_sources, flux, fluxErr, filterName,
                            ccdVisitId, midPointTai):
         """Set fluxes and visit info for DiaSources.
 
         Parameters
         ----------
-        dia_source : `lsst.afw.table.SourceRecord`
-            SourceRecord object to edit.
+        dia_sources : `lsst.afw.table.SourceCatalog`
+            Contiguous catalog of DiaSources to edit.
         flux : `double`
             Flux of DiaSource
         fluxErr : `double`
@@ -395,23 +424,23 @@ class TestAssociationTask(unittest.TestCase):
         midPointTai : `double`
             Time of observation
         """
-        dia_source['ccdVisitId'] = ccdVisitId
-        dia_source["midPointTai"] = midPointTai
-        dia_source["psFlux"] = flux / self.flux0
-        dia_source["psFluxErr"] = np.sqrt(
-            (fluxErr / self.flux0) ** 2
-            + (flux * self.flux0_err / self.flux0 ** 2) ** 2)
-        dia_source["apFlux"] = flux / self.flux0
-        dia_source["apFluxErr"] = np.sqrt(
+        calibFlux = flux / self.flux0
+        calibFluxErr = np.sqrt(
             (fluxErr / self.flux0) ** 2
             + (flux * self.flux0_err / self.flux0 ** 2) ** 2)
-        dia_source["totFlux"] = flux / self.flux0
-        dia_source["totFluxErr"] = np.sqrt(
-            (fluxErr / self.flux0) ** 2
-            + (flux * self.flux0_err / self.flux0 ** 2) ** 2)
-        dia_source["filterName"] = filterName
-        dia_source["x"] = 0.
-        dia_source["y"] = 0.
+        dia_sources['ccdVisitId'] = ccdVisitId
+        dia_sources["midPointTai"] = midPointTai
+        dia_sources["psFlux"] = calibFlux
+        dia_sources["psFluxErr"] = calibFluxErr
+        dia_sources["apFlux"] = calibFlux
+        dia_sources["apFluxErr"] = calibFluxErr
+        dia_sources["totFlux"] = calibFlux
+        dia_sources["totFluxErr"] = calibFluxErr
+        dia_sources["x"] = 0.
+        dia_sources["y"] = 0.
+        # String fields have no column view, so set them record by record.
+        for dia_source in dia_sources:
+            dia_source["filterName"] = filterName
 
     def _create_dia_objects_and_sources(self):
         """Method for storing a set of test DIAObjects and sources into
@@ -423,26 +452,26 @@ class TestAssociationTask(unittest.TestCase):
 
         # Create DIObjects, give them fluxes, and store them
         n_objects = 5
-        object_centers = np.array([
-            [self.wcs.pixelToSky(idx, idx).getRa().asDegrees(),
-             self.wcs.pixelToSky(idx, idx).getDec().asDegrees()]
-            for idx in np.linspace(1, 1000, 10)])
+        object_pixels = 1 + self.grid_step * np.arange(n_objects)
+        object_centers = np.column_stack(self.wcs.pixelToSkyArray(
+            object_pixels, object_pixels, degrees=True))
         dia_objects = create_test_points(
-            point_locs_deg=object_centers[:n_objects],
+            point_locs_deg=object_centers,
             start_id=0,
             schema=self.dia_object_schema,
             scatter_arcsec=-1,)
-        # Set the DIAObject fluxes and number of associated sources.
-        for dia_object in dia_objects:
-            dia_object["nDiaSources"] = 2
-            for filter_name in self.filter_names:
-                sphPoint = geom.SpherePoint(dia_object.getCoord())
-                htmIndex = self.pixelator.index(sphPoint.getVector())
-                dia_object["pixelId"] = htmIndex
-                dia_object['%sPSFluxMean' % filter_name] = 1
-                dia_object['%sPSFluxMeanErr' % filter_name] = 1
-                dia_object['%sPSFluxSigma' % filter_name] = 1
-                dia_object['%sPSFluxNdata' % filter_name] = 1
+        # Set the DIAObject fluxes and number of associated sources, a whole
+        # column at a time.
+        dia_objects["nDiaSources"] = 2
+        dia_objects["pixelId"] = np.array(
+            [self.pixelator.index(dia_object.getCoord().getVector())
+             for dia_object in dia_objects],
+            dtype=np.int64)
+        for filter_name in self.filter_names:
+            dia_objects['%sPSFluxMean' % filter_name] = 1
+            dia_objects['%sPSFluxMeanErr' % filter_name] = 1
+            dia_objects['%sPSFluxSigma' % filter_name] = 1
+            dia_objects['%sPSFluxNdata' % filter_name] = 1
         dia_objects = dia_objects.asAstropy().to_pandas()
         dia_objects.rename(columns={"coord_ra": "ra",
                                     "coord_dec": "decl",
@@ -457,29 +486,24 @@ class TestAssociationTask(unittest.TestCase):
         # Create DIASources, update their ccdVisitId and fluxes, and store
         # them.
         dia_sources = create_test_points(
-            point_locs_deg=np.concatenate(
-                [object_centers[:n_objects], object_centers[:n_objects]]),
+            point_locs_deg=np.concatenate([object_centers, object_centers]),
             start_id=0,
             scatter_arcsec=-1,
-            associated_ids=[0, 1, 2, 3, 4,
-                            0, 1, 2, 3, 4])
-        for src_idx, dia_source in enumerate(dia_sources):
-            if src_idx < n_objects:
-                self._set_source_values(
-                    dia_source=dia_source,
-                    flux=10000,
-                    fluxErr=100,
-                    filterName='g',
-                    ccdVisitId=1232,
-                    midPointTai=dateTime.get(system=dafBase.DateTime.MJD))
-            else:
-                self._set_source_values(
-                    dia_source=dia_source,
-                    flux=10000,
-                    fluxErr=100,
-                    filterName='r',
-                    ccdVisitId=1233,
-                    midPointTai=dateTime.get(system=dafBase.DateTime.MJD))
+            associated_ids=np.tile(np.arange(n_objects, dtype=np.int64), 2))
+        self._set_source_values(
+            dia_sources=dia_sources[:n_objects],
+            flux=10000,
+            fluxErr=100,
+            filterName='g',
+            ccdVisitId=1232,
+            midPointTai=dateTime.get(system=dafBase.DateTime.MJD))
+        self._set_source_values(
+            dia_sources=dia_sources[n_objects:],
+            flux=10000,
+            fluxErr=100,
+            filterName='r',
+            ccdVisitId=1233,
+            midPointTai=dateTime.get(system=dafBase.DateTime.MJD))
         dia_sources = dia_sources.asAstropy().to_pandas()
         dia_sources.rename(columns={"coord_ra": "ra",
                                     "coord_dec": "decl",
@@ -496,8 +520,7 @@ class TestAssociationTask(unittest.TestCase):
         """
         n_objects = 5
         dia_objects = create_test_points_pandas(
-            point_locs_deg=[[0.04 * obj_idx, 0.04 * obj_idx]
-                            for obj_idx in range(n_objects)],
+            point_locs_deg=_diagonal_points(n_objects),
             start_id=0,
             schema=self.dia_object_schema,
             scatter_arcsec=-1,)
@@ -508,10 +531,7 @@ class TestAssociationTask(unittest.TestCase):
 
         n_sources = 5
         dia_sources = create_test_points_pandas(
-            point_locs_deg=[
-                [0.04 * (src_idx + 1),
-                 0.04 * (src_idx + 1)]
-                for src_idx in range(n_sources)],
+            point_locs_deg=_diagonal_points(n_sources, start=1),
             start_id=n_objects,
             scatter_arcsec=0.1)
         dia_sources.rename(columns={"coord_ra": "ra",
@@ -541,8 +561,7 @@ class TestAssociationTask(unittest.TestCase):
         # Create a set of DIAObjects that contain only one DIASource
         n_objects = 5
         dia_objects = create_test_points_pandas(
-            point_locs_deg=[[0.04 * obj_idx, 0.04 * obj_idx]
-                            for obj_idx in range(n_objects)],
+            point_locs_deg=_diagonal_points(n_objects),
             start_id=0,
             schema=self.dia_object_schema,
             scatter_arcsec=-1,)
@@ -553,10 +572,7 @@ class TestAssociationTask(unittest.TestCase):
 
         n_sources = 5
         dia_sources = create_test_points_pandas(
-            point_locs_deg=[
-                [0.04 * (src_idx + 1),
-                 0.04 * (src_idx + 1)]
-                for src_idx in range(n_sources)],
+            point_locs_deg=_diagonal_points(n_sources, start=1),
             start_id=n_objects,
             scatter_arcsec=-1)
         dia_sources.rename(columns={"coord_ra": "ra",
@@ -588,8 +604,7 @@ class TestAssociationTask(unittest.TestCase):
         # Test updating all DiaObjects
         n_objects = 4
         dia_objects = create_test_points_pandas(
-            point_locs_deg=[[0.04 * obj_idx, 0.04 * obj_idx]
-                            for obj_idx in range(n_objects)],
+            point_locs_deg=_diagonal_points(n_objects),
             start_id=0,
             schema=self.dia_object_schema,
             scatter_arcsec=-1,)
@@ -600,10 +615,7 @@ class TestAssociationTask(unittest.TestCase):
 
         n_sources = 4
         dia_sources = create_test_points_pandas(
-            point_locs_deg=[
-                [0.04 * src_idx,
-                 0.04 * src_idx]
-                for src_idx in range(n_sources)],
+            point_locs_deg=_diagonal_points(n_sources),
             start_id=n_objects,
             scatter_arcsec=-1)
 
@@ -621,10 +633,7 @@ class TestAssociationTask(unittest.TestCase):
     def test_remove_nan_dia_sources(self):
         n_sources = 6
         dia_sources = create_test_points_pandas(
-            point_locs_deg=[
-                [0.04 * (src_idx + 1),
-                 0.04 * (src_idx + 1)]
-                for src_idx in range(n_sources)],
+            point_locs_deg=_diagonal_points(n_sources, start=1),
             start_id=0,
             scatter_arcsec=-1)
         dia_sources.rename(columns={"coord_ra": "ra",
@@ -20,12 +20,14 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import numpy as np
+import pandas as pd
 import unittest
 import unittest.mock
 
 from lsst.afw.cameraGeom.testUtils import DetectorWrapper
 import lsst.afw.geom as afwGeom
 import lsst.afw.image as afwImage
+import lsst.afw.math as afwMath
 import lsst.afw.table as afwTable
 import lsst.daf.base as dafBase
 import lsst.meas.algorithms as measAlg
@@ -53,128 +55,144 @@ def create_test_dia_objects(n_points, wcs, startPos=100):
         Catalog of points to test.
     """
     objects = afwTable.SourceCatalog(make_dia_object_schema())
+    objects.resize(n_points)
 
-    for src_idx in range(n_points):
-        src = objects.addNew()
-        src['id'] = src_idx
-        src.setCoord(wcs.pixelToSky(startPos + src_idx,
-                                    startPos + src_idx))
+    pixels = startPos + np.arange(n_points, dtype=np.float64)
+    ras, decs = wcs.pixelToSkyArray(pixels, pixels)
+    objects['id'] = np.arange(n_points, dtype=np.int64)
+    objects['coord_ra'] = ras
+    objects['coord_dec'] = decs
 
     return objects
 
 
 class TestDiaForcedSource(unittest.TestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
+        # None of the fixtures are modified by the tests, so build the WCS,
+        # images, and test objects once for the class.
+
         # metadata taken from CFHT data
         # v695856-e0/v695856-e0-c000-a00.sci_img.fits
-        self.metadata = dafBase.PropertySet()
-
-        self.metadata.set("SIMPLE", "T")
-        self.metadata.set("BITPIX", -32)
-        self.metadata.set("NAXIS", 2)
-        self.metadata.set("NAXIS1", 1024)
-        self.metadata.set("NAXIS2", 1153)
-        self.metadata.set("RADECSYS", 'FK5')
-        self.metadata.set("EQUINOX", 2000.)
-
-        self.metadata.setDouble("CRVAL1", 215.604025685476)
-        self.metadata.setDouble("CRVAL2", 53.1595451514076)
-        self.metadata.setDouble("CRPIX1", 1109.99981456774)
-        self.metadata.setDouble("CRPIX2", 560.018167811613)
-        self.metadata.set("CTYPE1", 'RA---SIN')
-        self.metadata.set("CTYPE2", 'DEC--SIN')
-
-        self.metadata.setDouble("CD1_1", 5.10808596133527E-05)
-        self.metadata.setDouble("CD1_2", 1.85579539217196E-07)
-        self.metadata.setDouble("CD2_2", -5.10281493481982E-05)
-        self.metadata.setDouble("CD2_1", -8.27440751733828E-07)
-
-        self.wcs = afwGeom.makeSkyWcs(self.metadata)
-
-        self.calibration = 10000
-        self.calibrationErr = 100
-        self.exposureId = 1234
-        self.exposureTime = 200.
-        self.imageSize = [1024, 1153]
-        self.dateTime = "2014-05-13T17:00:00.000000000"
+        cls.metadata = dafBase.PropertySet()
+
+        cls.metadata.set("SIMPLE", "T")
+        cls.metadata.set("BITPIX", -32)
+        cls.metadata.set("NAXIS", 2)
+        cls.metadata.set("NAXIS1", 1024)
+        cls.metadata.set("NAXIS2", 1153)
+        cls.metadata.set("RADECSYS", 'FK5')
+        cls.metadata.set("EQUINOX", 2000.)
+
+        cls.metadata.setDouble("CRVAL1", 215.604025685476)
+        cls.metadata.setDouble("CRVAL2", 53.1595451514076)
+        cls.metadata.setDouble("CRPIX1", 1109.99981456774)
+        cls.metadata.setDouble("CRPIX2", 560.018167811613)
+        cls.metadata.set("CTYPE1", 'RA---SIN')
+        cls.metadata.set("CTYPE2", 'DEC--SIN')
+
+        cls.metadata.setDouble("CD1_1", 5.10808596133527E-05)
+        cls.metadata.setDouble("CD1_2", 1.85579539217196E-07)
+        cls.metadata.setDouble("CD2_2", -5.10281493481982E-05)
+        cls.metadata.setDouble("CD2_1", -8.27440751733828E-07)
+
+        cls.wcs = afwGeom.makeSkyWcs(cls.metadata)
+
+        cls.calibration = 10000
+        cls.calibrationErr = 100
+        cls.exposureId = 1234
+        cls.exposureTime = 200.
+        cls.imageSize = [1024, 1153]
+        cls.dateTime = "2014-05-13T17:00:00.000000000"
 
         # Make images  with one source in them and distinct values and
         # variance for each image.
         # Direct Image
         source_image = afwImage.MaskedImageF(
-            lsst.geom.ExtentI(self.imageSize[0] + 1, self.imageSize[1] + 1))
+            lsst.geom.ExtentI(cls.imageSize[0] + 1, cls.imageSize[1] + 1))
         source_image.image[100, 100, afwImage.LOCAL] = 10
         source_image.getVariance().set(1)
         bbox = lsst.geom.BoxI(
             lsst.geom.PointI(1, 1),
-            lsst.geom.ExtentI(self.imageSize[0],
-                              self.imageSize[1]))
+            lsst.geom.ExtentI(cls.imageSize[0],
+                              cls.imageSize[1]))
         masked_image = afwImage.MaskedImageF(source_image, bbox, afwImage.LOCAL)
-        self.exposure = afwImage.makeExposure(masked_image, self.wcs)
+        cls.exposure = afwImage.makeExposure(masked_image, cls.wcs)
 
         detector = DetectorWrapper(
-            id=23, bbox=self.exposure.getBBox()).detector
+            id=23, bbox=cls.exposure.getBBox()).detector
         visit = afwImage.VisitInfo(
-            exposureId=self.exposureId,
-            exposureTime=self.exposureTime,
-            date=dafBase.DateTime(self.dateTime,
+            exposureId=cls.exposureId,
+            exposureTime=cls.exposureTime,
+            date=dafBase.DateTime(cls.dateTime,
                                   dafBase.DateTime.Timescale.TAI))
-        self.exposure.setDetector(detector)
-        self.exposure.getInfo().setVisitInfo(visit)
-        self.exposure.setFilterLabel(afwImage.FilterLabel(band='g', physical='g.MP9401'))
-        self.exposure.setPhotoCalib(afwImage.PhotoCalib(self.calibration, self.calibrationErr))
+        cls.exposure.setDetector(detector)
+        cls.exposure.getInfo().setVisitInfo(visit)
+        cls.exposure.setFilterLabel(afwImage.FilterLabel(band='g', physical='g.MP9401'))
+        cls.exposure.setPhotoCalib(afwImage.PhotoCalib(cls.calibration, cls.calibrationErr))
 
         # Difference Image
         source_image = afwImage.MaskedImageF(
-            lsst.geom.ExtentI(self.imageSize[0] + 1, self.imageSize[1] + 1))
+            lsst.geom.ExtentI(cls.imageSize[0] + 1, cls.imageSize[1] + 1))
         source_image.image[100, 100, afwImage.LOCAL] = 20
         source_image.getVariance().set(2)
         bbox = lsst.geom.BoxI(
             lsst.geom.PointI(1, 1),
-            lsst.geom.ExtentI(self.imageSize[0],
-                              self.imageSize[1]))
+            lsst.geom.ExtentI(cls.imageSize[0],
+                              cls.imageSize[1]))
         masked_image = afwImage.MaskedImageF(source_image, bbox, afwImage.LOCAL)
-        self.diffim = afwImage.makeExposure(masked_image, self.wcs)
-        self.diffim.setDetector(detector)
-        self.diffim.getInfo().setVisitInfo(visit)
-        self.diffim.setFilterLabel(afwImage.FilterLabel(band='g', physical='g.MP9401'))
-        self.diffim.setPhotoCalib(afwImage.PhotoCalib(self.calibration, self.calibrationErr))
+        cls.diffim = afwImage.makeExposure(masked_image, cls.wcs)
+        cls.diffim.setDetector(detector)
+        cls.diffim.getInfo().setVisitInfo(visit)
+        cls.diffim.setFilterLabel(afwImage.FilterLabel(band='g', physical='g.MP9401'))
+        cls.diffim.setPhotoCalib(afwImage.PhotoCalib(cls.calibration, cls.calibrationErr))
 
-        self.expIdBits = 16
+        cls.expIdBits = 16
 
         FWHM = 5
         psf = measAlg.DoubleGaussianPsf(15, 15, FWHM/(2*np.sqrt(2*np.log(2))))
-        self.exposure.setPsf(psf)
-        self.diffim.setPsf(psf)
+        cls.exposure.setPsf(psf)
+        cls.diffim.setPsf(psf)
 
-        self.testDiaObjects = create_test_dia_objects(5, self.wcs)
+        cls.testDiaObjects = create_test_dia_objects(5, cls.wcs)
         # Add additional diaObjects that are outside of the above difference
         # and calexp visit images.
         # xy outside
-        src = self.testDiaObjects.addNew()
+        src = cls.testDiaObjects.addNew()
         src['id'] = 10000000
-        src.setCoord(self.wcs.pixelToSky(-100000,
-                                         -100000))
+        src.setCoord(cls.wcs.pixelToSky(-100000,
+                                        -100000))
         # y outside
-        src = self.testDiaObjects.addNew()
+        src = cls.testDiaObjects.addNew()
         src['id'] = 10000001
-        src.setCoord(self.wcs.pixelToSky(100,
-                                         -100000))
+        src.setCoord(cls.wcs.pixelToSky(100,
+                                        -100000))
         # x outside
-        src = self.testDiaObjects.addNew()
+        src = cls.testDiaObjects.addNew()
         src['id'] = 10000002
-        src.setCoord(self.wcs.pixelToSky(-100000,
-                                         100))
+        src.setCoord(cls.wcs.pixelToSky(-100000,
+                                        100))
+        # Records added after the catalog was resized live in a separate
+        # memory block; deep copy so that the catalog is contiguous again.
+        cls.testDiaObjects = cls.testDiaObjects.copy(deep=True)
         # Ids of objects that were "updated" during "ap_association"
         # processing.
-        self.updatedTestIds = np.array([1, 2, 3, 4, 10000001], dtype=np.uint64)
+        cls.updatedTestIds = np.array([1, 2, 3, 4, 10000001], dtype=np.uint64)
         # Expecdted number of sources is the number of updated ids plus
         # any that are within the CCD footprint but are not in the
         # above list of ids.
-        self.expectedDiaForcedSources = 6
+        cls.expectedDiaForcedSources = 6
+
+        cls.expected_n_columns = 11
 
-        self.expected_n_columns = 11
+    @classmethod
+    def tearDownClass(cls):
+        del cls.metadata
+        del cls.wcs
+        del cls.exposure
+        del cls.diffim
+        del cls.testDiaObjects
 
     def testRun(self):
         """Test that forced source catalogs are successfully created and have
@@ -207,19 +225,197 @@ class TestDiaForcedSource(unittest.TestCase):
         self.assertEqual(len(dia_forced_sources.columns),
                          self.expected_n_columns)
 
-        for (diaFS_id, diaFS), testObj, dirVal, diffVal, dirVar, diffVar in zip(dia_forced_sources.iterrows(),
-                                                                                self.testDiaObjects,
-                                                                                direct_values,
-                                                                                diff_values,
-                                                                                direct_var,
-                                                                                diff_var):
-            self.assertAlmostEqual(diaFS["psFlux"] / diffVal, 1.)
-            self.assertAlmostEqual(diaFS["psFluxErr"] / diffVar, 1.)
+        # Compare whole columns; the first rows are the DiaObjects with
+        # expected values. A relative tolerance of 5e-8 matches the previous
+        # per-row assertAlmostEqual on the ratio.
+        n_expected = len(diff_values)
+        for column, expected in [("psFlux", diff_values),
+                                 ("psFluxErr", diff_var),
+                                 ("totFlux", direct_values),
+                                 ("totFluxErr", direct_var)]:
+            np.testing.assert_allclose(
+                dia_forced_sources[column].to_numpy()[:n_expected],
+                expected,
+                rtol=5e-8)
+        np.testing.assert_array_equal(
+            dia_forced_sources["ccdVisitId"].to_numpy(),
+            self.exposureId)
+        self.assertEqual(dia_forced_sources["filterName"].dtype, object)
+        np.testing.assert_array_equal(
+            dia_forced_sources["filterName"].to_numpy(),
+            self.diffim.getFilterLabel().bandLabel)
+
+    def testRunFloat32(self):
+        """Test that the flux and centroid columns can be output in single
+        precision without changing the id columns.
+        """
+        test_objects = self._convert_to_pandas(self.testDiaObjects)
+        test_objects.set_index("diaObjectId", inplace=True, drop=False)
+        config = DiaForcedSourceTask.ConfigClass()
+        config.outputFloatDtype = "float32"
+        dfs = DiaForcedSourceTask(config=config)
+        dia_forced_sources = dfs.run(
+            test_objects, self.updatedTestIds, self.expIdBits, self.exposure, self.diffim)
 
-            self.assertAlmostEqual(diaFS["totFlux"] / dirVal, 1.)
-            self.assertAlmostEqual(diaFS["totFluxErr"] / dirVar, 1.)
+        self.assertEqual(len(dia_forced_sources), self.expectedDiaForcedSources)
+        for column in ["psFlux", "psFluxErr", "totFlux", "totFluxErr",
+                       "x", "y"]:
+            self.assertEqual(dia_forced_sources[column].dtype, np.float32)
+        for column in ["diaObjectId", "diaForcedSourceId", "ccdVisitId"]:
+            self.assertEqual(dia_forced_sources[column].dtype, np.int64)
+
+        # The single precision values must agree with a double precision run.
+        dia_forced_sources_64 = DiaForcedSourceTask().run(
+            test_objects, self.updatedTestIds, self.expIdBits, self.exposure, self.diffim)
+        for column in ["psFlux", "psFluxErr", "totFlux", "totFluxErr",
+                       "x", "y"]:
+            np.testing.assert_allclose(
+                dia_forced_sources[column].to_numpy(),
+                dia_forced_sources_64[column].to_numpy(),
+                rtol=1e-6)
+
+    def testMakeForcedSourceIds(self):
+        """Test that DiaForcedSource ids match those of an afw source
+        IdFactory for the exposure.
+        """
+        dfs = DiaForcedSourceTask()
+        n_sources = 10
+        ids = dfs._make_forced_source_ids(n_sources,
+                                          self.exposureId,
+                                          self.expIdBits)
+        idFactory = afwTable.IdFactory.makeSource(
+            self.exposureId,
+            afwTable.IdFactory.computeReservedFromMaxBits(self.expIdBits))
+        np.testing.assert_array_equal(
+            ids, [idFactory() for _ in range(n_sources)])
+
+        # With a large exposure id only a few bits are left for the source
+        # counter, which starts at one.
+        expIdBits = 60
+        reserved = afwTable.IdFactory.computeReservedFromMaxBits(expIdBits)
+        maxSources = (1 << reserved) - 1
+        ids = dfs._make_forced_source_ids(maxSources,
+                                          self.exposureId,
+                                          expIdBits)
+        self.assertEqual(len(np.unique(ids)), maxSources)
+        with self.assertRaises(ValueError):
+            dfs._make_forced_source_ids(maxSources + 1,
+                                        self.exposureId,
+                                        expIdBits)
+
+    def testCalibrateFluxes(self):
+        """Test that calibrating the slot PsfFlux of a whole catalog matches
+        ``PhotoCalib.instFluxToNanojansky`` for a spatially varying
+        calibration.
+        """
+        dfs = DiaForcedSourceTask()
+        n_sources = 5
+        refCat = afwTable.SourceCatalog(
+            afwTable.SourceTable.makeMinimalSchema())
+        refCat.resize(n_sources)
+        refCat["id"] = np.arange(n_sources, dtype=np.int64)
+        measCat = dfs._make_meas_cat(refCat)
+        measCat["ap_assoc_TransformedCentroid_x"] = np.linspace(
+            1, self.imageSize[0], n_sources)
+        measCat["ap_assoc_TransformedCentroid_y"] = np.linspace(
+            1, self.imageSize[1], n_sources)
+        # Include a zero flux, which afw gives a NaN error.
+        measCat["base_PsfFlux_instFlux"] = np.array(
+            [0., 10., -20., 300., 4000.])
+        measCat["base_PsfFlux_instFluxErr"] = np.array(
+            [1., 2., 3., 4., 5.])
+
+        coefficients = np.array([[self.calibration, 10.], [-5., 0.5]])
+        calib = afwImage.PhotoCalib(
+            afwMath.ChebyshevBoundedField(self.exposure.getBBox(),
+                                          coefficients),
+            self.calibrationErr)
+
+        fluxes = dfs._calibrate_fluxes(calib, measCat)
+        np.testing.assert_allclose(
+            fluxes,
+            calib.instFluxToNanojansky(measCat, "slot_PsfFlux"),
+            rtol=1e-12)
+        self.assertTrue(np.isnan(fluxes[0, 1]))
+
+    def testTrimToExposureEdges(self):
+        """Test that DiaForcedSources on the edges of the exposure bounding
+        box are trimmed the same way as ``Box2D.contains``.
+        """
+        bbox = lsst.geom.Box2D(self.exposure.getBBox())
+        x = np.array([bbox.getMinX(), bbox.getMaxX(),
+                      bbox.getCenterX(), bbox.getCenterX()])
+        y = np.array([bbox.getCenterY(), bbox.getCenterY(),
+                      bbox.getMinY(), bbox.getMaxY()])
+        catalog = self._make_trim_catalog(x, y, [1, 2, 3, 4])
 
-            self.assertEqual(diaFS["ccdVisitId"], self.exposureId)
+        dfs = DiaForcedSourceTask()
+        trimmed = dfs._trim_to_exposure(catalog,
+                                        np.array([], dtype=np.int64),
+                                        self.exposure)
+        # The box is half-open: sources on the minimum edges are kept and
+        # those on the maximum edges are dropped.
+        np.testing.assert_array_equal(bbox.contains(x, y),
+                                      [True, False, True, False])
+        np.testing.assert_array_equal(trimmed["diaObjectId"].to_numpy(),
+                                      [1, 3])
+
+    def testTrimToExposureUpdatedIds(self):
+        """Test that updated DiaObjects are kept when trimming, whatever the
+        order of the updated ids, and that none are kept without them.
+        """
+        bbox = lsst.geom.Box2D(self.exposure.getBBox())
+        # Only the last source is within the exposure.
+        x = np.array([-100., -100., -100., -100., bbox.getCenterX()])
+        y = np.full(5, bbox.getCenterY())
+        catalog = self._make_trim_catalog(x, y, [10, 20, 30, 40, 50])
+        dfs = DiaForcedSourceTask()
+
+        trimmed = dfs._trim_to_exposure(
+            catalog, np.array([30, 10, 20], dtype=np.uint64), self.exposure)
+        np.testing.assert_array_equal(trimmed["diaObjectId"].to_numpy(),
+                                      [10, 20, 30, 50])
+
+        trimmed = dfs._trim_to_exposure(
+            catalog, np.array([], dtype=np.uint64), self.exposure)
+        np.testing.assert_array_equal(trimmed["diaObjectId"].to_numpy(),
+                                      [50])
+
+    def testTrimToExposureAllUpdated(self):
+        """Test that the catalog is returned untrimmed when every DiaObject
+        was updated.
+        """
+        x = np.array([-100., 100., -100000.])
+        y = np.array([100., -100., -100000.])
+        catalog = self._make_trim_catalog(x, y, [1, 2, 3])
+        dfs = DiaForcedSourceTask()
+
+        trimmed = dfs._trim_to_exposure(
+            catalog, np.array([3, 2, 1], dtype=np.uint64), self.exposure)
+        self.assertIs(trimmed, catalog)
+
+    def _make_trim_catalog(self, x, y, diaObjectIds):
+        """Create a minimal DiaForcedSource catalog for testing
+        ``_trim_to_exposure``.
+
+        Parameters
+        ----------
+        x : array-like of `float`
+            Pixel x positions of the DiaForcedSources.
+        y : array-like of `float`
+            Pixel y positions of the DiaForcedSources.
+        diaObjectIds : array-like of `int`
+            Ids of the DiaObjects the DiaForcedSources were measured at.
+
+        Returns
+        -------
+        catalog : `pandas.DataFrame`
+            Catalog with ``diaObjectId``, ``x``, and ``y`` columns.
+        """
+        return pd.DataFrame({
+            "diaObjectId": np.asarray(diaObjectIds, dtype=np.int64),
+            "x": np.asarray(x, dtype=np.float64),
+            "y": np.asarray(y, dtype=np.float64)})
 
     def _convert_to_pandas(self, dia_objects):
         """Convert input afw table to pandas.
@@ -240,8 +436,8 @@ class TestDiaForcedSource(unittest.TestCase):
                                        "coord_dec": "decl"},
                               inplace=True)
 
-        output_catalog.loc[:, "ra"] = np.degrees(output_catalog["ra"])
-        output_catalog.loc[:, "decl"] = np.degrees(output_catalog["decl"])
+        output_catalog["ra"] = np.degrees(output_catalog["ra"])
+        output_catalog["decl"] = np.degrees(output_catalog["decl"])
 
         return output_catalog
 
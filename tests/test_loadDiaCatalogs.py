@@ -22,7 +22,6 @@
 import os
 import numpy as np
 import pandas as pd
-import tempfile
 import unittest
 
 from lsst.afw.cameraGeom.testUtils import DetectorWrapper
@@ -59,6 +58,30 @@ def _data_file_name(basename, module_name):
     return os.path.join(getPackageDir(module_name), "data", basename)
 
 
+def _computeHtmIndices(ras, decs, pixelator):
+    """Compute the HTM index of each of a set of sky positions.
+
+    Parameters
+    ----------
+    ras : `numpy.ndarray`
+        Right ascensions in radians.
+    decs : `numpy.ndarray`
+        Declinations in radians.
+    pixelator : `lsst.sphgeom.HtmPixelization`
+        Object to compute spatial indicies from.
+
+    Returns
+    -------
+    htmIndices : `numpy.ndarray`
+        HTM index of each position.
+    """
+    return np.array(
+        [pixelator.index(
+            sphgeom.UnitVector3d(sphgeom.LonLat.fromRadians(ra, dec)))
+         for ra, dec in zip(ras, decs)],
+        dtype=np.int64)
+
+
 def makeExposure(flipX=False, flipY=False):
     """Create an exposure and flip the x or y (or both) coordinates.
 
@@ -145,24 +168,19 @@ def makeDiaObjects(nObjects, exposure, pixelator):
     midPointTaiMJD = exposure.getInfo().getVisitInfo().getDate().get(
         system=dafBase.DateTime.MJD)
 
-    wcs = exposure.getWcs()
+    ras, decs = exposure.getWcs().pixelToSkyArray(rand_x, rand_y)
 
-    data = []
-    for idx, (x, y) in enumerate(zip(rand_x, rand_y)):
-        coord = wcs.pixelToSky(x, y)
-        htmIdx = pixelator.index(coord.getVector())
-        newObject = {"ra": coord.getRa().asDegrees(),
-                     "decl": coord.getRa().asDegrees(),
-                     "radecTai": midPointTaiMJD,
-                     "diaObjectId": idx,
-                     "pixelId": htmIdx,
-                     "pmParallaxNdata": 0,
-                     "nearbyObj1": 0,
-                     "nearbyObj2": 0,
-                     "nearbyObj3": 0}
-        for f in ["u", "g", "r", "i", "z", "y"]:
-            newObject["%sPSFluxNdata" % f] = 0
-        data.append(newObject)
+    data = {"ra": np.degrees(ras),
+            "decl": np.degrees(decs),
+            "radecTai": midPointTaiMJD,
+            "diaObjectId": np.arange(nObjects, dtype=np.int64),
+            "pixelId": _computeHtmIndices(ras, decs, pixelator),
+            "pmParallaxNdata": 0,
+            "nearbyObj1": 0,
+            "nearbyObj2": 0,
+            "nearbyObj3": 0}
+    for f in ["u", "g", "r", "i", "z", "y"]:
+        data["%sPSFluxNdata" % f] = 0
 
     return pd.DataFrame(data=data)
 
@@ -194,20 +212,15 @@ def makeDiaSources(nSources, diaObjectIds, exposure, pixelator):
     midPointTaiMJD = exposure.getInfo().getVisitInfo().getDate().get(
         system=dafBase.DateTime.MJD)
 
-    wcs = exposure.getWcs()
-
-    data = []
-    for idx, (x, y, objId) in enumerate(zip(rand_x, rand_y, rand_ids)):
-        coord = wcs.pixelToSky(x, y)
-        htmIdx = pixelator.index(coord.getVector())
-        data.append({"ra": coord.getRa().asDegrees(),
-                     "decl": coord.getRa().asDegrees(),
-                     "diaObjectId": objId,
-                     "diaSourceId": idx,
-                     "pixelId": htmIdx,
-                     "midPointTai": midPointTaiMJD})
+    ras, decs = exposure.getWcs().pixelToSkyArray(rand_x, rand_y)
 
-    return pd.DataFrame(data=data)
+    return pd.DataFrame(
+        data={"ra": np.degrees(ras),
+              "decl": np.degrees(decs),
+              "diaObjectId": rand_ids,
+              "diaSourceId": np.arange(nSources, dtype=np.int64),
+              "pixelId": _computeHtmIndices(ras, decs, pixelator),
+              "midPointTai": midPointTaiMJD})
 
 
 def makeDiaForcedSources(nForcedSources, diaObjectIds, exposure):
@@ -245,59 +258,59 @@ def makeDiaForcedSources(nForcedSources, diaObjectIds, exposure):
 
 class TestLoadDiaCatalogs(unittest.TestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         np.random.seed(1234)
 
-        self.db_file_fd, self.db_file = tempfile.mkstemp(
-            dir=os.path.dirname(__file__))
-
-        self.apdbConfig = ApdbConfig()
-        self.apdbConfig.db_url = "sqlite:///" + self.db_file
-        self.apdbConfig.isolation_level = "READ_UNCOMMITTED"
-        self.apdbConfig.dia_object_index = "baseline"
-        self.apdbConfig.dia_object_columns = []
-        self.apdbConfig.schema_file = _data_file_name(
+        # The tests only read from the database, so one in-memory database
+        # filled once is shared by all of them.
+        cls.apdbConfig = ApdbConfig()
+        cls.apdbConfig.db_url = "sqlite://"
+        cls.apdbConfig.isolation_level = "READ_UNCOMMITTED"
+        cls.apdbConfig.dia_object_index = "baseline"
+        cls.apdbConfig.dia_object_columns = []
+        cls.apdbConfig.schema_file = _data_file_name(
             "apdb-schema.yaml", "dax_apdb")
-        self.apdbConfig.column_map = _data_file_name(
+        cls.apdbConfig.column_map = _data_file_name(
             "apdb-ap-pipe-afw-map.yaml", "ap_association")
-        self.apdbConfig.extra_schema_file = _data_file_name(
+        cls.apdbConfig.extra_schema_file = _data_file_name(
             "apdb-ap-pipe-schema-extra.yaml", "ap_association")
 
-        self.apdb = Apdb(config=self.apdbConfig,
-                         afw_schemas=dict(DiaObject=make_dia_object_schema(),
-                                          DiaSource=make_dia_source_schema()))
-        self.apdb.makeSchema()
+        cls.apdb = Apdb(config=cls.apdbConfig,
+                        afw_schemas=dict(DiaObject=make_dia_object_schema(),
+                                         DiaSource=make_dia_source_schema()))
+        cls.apdb.makeSchema()
 
         # Expected HTM pixel ranges for max range=4 and level = 20. This
         # set of pixels should be same for the WCS created by default in
         # makeExposure and for one with a flipped y axis.
-        self.ranges = np.sort(np.array([15154776375296, 15154779521024,
-                                        15154788958208, 15154792103936]))
+        cls.ranges = np.sort(np.array([15154776375296, 15154779521024,
+                                       15154788958208, 15154792103936]))
 
-        self.pixelator = sphgeom.HtmPixelization(20)
-        self.exposure = makeExposure(False, False)
+        cls.pixelator = sphgeom.HtmPixelization(20)
+        cls.exposure = makeExposure(False, False)
 
-        self.diaObjects = makeDiaObjects(20, self.exposure, self.pixelator)
-        self.diaSources = makeDiaSources(
+        cls.diaObjects = makeDiaObjects(20, cls.exposure, cls.pixelator)
+        cls.diaSources = makeDiaSources(
             100,
-            self.diaObjects["diaObjectId"].to_numpy(),
-            self.exposure,
-            self.pixelator)
-        self.diaForcedSources = makeDiaForcedSources(
+            cls.diaObjects["diaObjectId"].to_numpy(),
+            cls.exposure,
+            cls.pixelator)
+        cls.diaForcedSources = makeDiaForcedSources(
             200,
-            self.diaObjects["diaObjectId"].to_numpy(),
-            self.exposure)
-
-        self.apdb.storeDiaSources(self.diaSources)
-        self.apdb.storeDiaForcedSources(self.diaForcedSources)
-        self.dateTime = \
-            self.exposure.getInfo().getVisitInfo().getDate().toPython()
-        self.apdb.storeDiaObjects(self.diaObjects,
-                                  self.dateTime)
-
-    def tearDown(self):
-        os.close(self.db_file_fd)
-        os.remove(self.db_file)
+            cls.diaObjects["diaObjectId"].to_numpy(),
+            cls.exposure)
+
+        cls.apdb.storeDiaSources(cls.diaSources)
+        cls.apdb.storeDiaForcedSources(cls.diaForcedSources)
+        cls.dateTime = \
+            cls.exposure.getInfo().getVisitInfo().getDate().toPython()
+        cls.apdb.storeDiaObjects(cls.diaObjects,
+                                 cls.dateTime)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.apdb
 
     def testRun(self):
         """Test the full run method for the loader.
@@ -223,10 +223,10 @@ def _roundTripThroughApdb(objects, sources, forcedSources, dateTime):
     sources : `pandas.DataFrame`
         Round tripped sources.
     """
-    tmpFile = tempfile.NamedTemporaryFile()
-
     apdbConfig = ApdbConfig()
-    apdbConfig.db_url = "sqlite:///" + tmpFile.name
+    # In-memory sqlite keeps a single connection for the life of the Apdb
+    # instead of reopening a temporary file for each query.
+    apdbConfig.db_url = "sqlite://"
     apdbConfig.isolation_level = "READ_UNCOMMITTED"
     apdbConfig.dia_object_index = "baseline"
     apdbConfig.dia_object_columns = []